@@ -23,6 +23,7 @@ UNIVERSE_TTL = 3600  # 1 hour
 STOCK_TTL = 300      # 5 minutes
 MARKET_TTL = 600     # 10 minutes
 NEWS_TTL = 1800      # 30 minutes
+DB_QUERY_TTL = 900   # 15 minutes, matches the market-hours refresh interval
 
 # Rate limiting
 FINNHUB_RATE_LIMIT = 60  # calls per minute (free tier)
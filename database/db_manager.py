@@ -1,36 +1,273 @@
+import logging
+import queue
 import sqlite3
 import threading
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Optional
+from typing import Callable, Iterator, List, Optional, Tuple
 from datetime import datetime, timedelta
 
+from config import DB_QUERY_TTL
+from utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Read-only connections kept open and shared across request threads
+POOL_SIZE = 4
+
+# Seconds to wait for a pooled connection before giving up
+POOL_TIMEOUT = 30.0
+
+# Rows per savepoint in insert_stocks_bulk; a failing chunk falls back to per-row inserts
+INSERT_CHUNK_SIZE = 64
+
+# Applied to every new connection: WAL lets readers run alongside the refresh
+# writer, and synchronous=NORMAL needs only one fsync per commit under WAL
+_CONNECTION_PRAGMAS = """
+  PRAGMA journal_mode=WAL;
+  PRAGMA synchronous=NORMAL;
+  PRAGMA temp_store=MEMORY;
+  PRAGMA mmap_size=268435456;
+  PRAGMA cache_size=-64000;
+  PRAGMA busy_timeout=5000;
+  PRAGMA recursive_triggers=ON;
+"""
+
+# Read-only connections only need the read-side cache settings
+_READONLY_PRAGMAS = """
+  PRAGMA query_only=ON;
+  PRAGMA temp_store=MEMORY;
+  PRAGMA mmap_size=268435456;
+  PRAGMA cache_size=-64000;
+  PRAGMA busy_timeout=5000;
+"""
+
+_INSERT_STOCK_SQL = """
+  INSERT OR REPLACE INTO stocks (
+    ticker, name, sector, industry,
+    price, change_1d, change_1w, change_1m, change_1y, change_5y, change_ytd,
+    volume,
+    high_1d, low_1d, high_1m, low_1m, high_1y, low_1y, high_5y, low_5y,
+    pe_ratio, eps, dividend_yield, market_cap, shares_outstanding,
+    net_profit_margin, gross_margin, roe, revenue_ttm,
+    beta, institutional_ownership, debt_to_equity,
+    year_founded, website, city, state, zip, weight,
+    last_updated, data_source, is_sp500
+  ) VALUES (
+    :ticker, :name, :sector, :industry,
+    :price, :change_1d, :change_1w, :change_1m, :change_1y, :change_5y, :change_ytd,
+    :volume,
+    :high_1d, :low_1d, :high_1m, :low_1m, :high_1y, :low_1y, :high_5y, :low_5y,
+    :pe_ratio, :eps, :dividend_yield, :market_cap, :shares_outstanding,
+    :net_profit_margin, :gross_margin, :roe, :revenue_ttm,
+    :beta, :institutional_ownership, :debt_to_equity,
+    :year_founded, :website, :city, :state, :zip, :weight,
+    :last_updated, :data_source, :is_sp500
+  )
+"""
+
+# Allowed get_all_stocks() orderings; fixed SQL text keeps sqlite3's statement cache warm
+_ALL_STOCKS_QUERIES = {
+  "market_cap DESC": "SELECT * FROM stocks ORDER BY market_cap DESC",
+  "change_1d DESC": "SELECT * FROM stocks ORDER BY change_1d DESC",
+  "change_1d ASC": "SELECT * FROM stocks ORDER BY change_1d ASC",
+}
+
+# (API key, stocks column) pairs serialized by /api/universe/core and /api/universe/search
+_UNIVERSE_FIELDS = (
+  ("ticker", "ticker"),
+  ("name", "name"),
+  ("sector", "sector"),
+  ("industry", "industry"),
+  ("price", "price"),
+  ("change1D", "change_1d"),
+  ("change1W", "change_1w"),
+  ("change1M", "change_1m"),
+  ("change1Y", "change_1y"),
+  ("volume", "volume"),
+  ("peRatio", "pe_ratio"),
+  ("eps", "eps"),
+  ("dividendYield", "dividend_yield"),
+  ("marketCap", "market_cap"),
+  ("netProfitMargin", "net_profit_margin"),
+  ("grossMargin", "gross_margin"),
+  ("roe", "roe"),
+  ("revenue", "revenue_ttm"),
+  ("beta", "beta"),
+  ("institutionalOwnership", "institutional_ownership"),
+  ("yearFounded", "year_founded"),
+  ("website", "website"),
+  ("updatedAt", "last_updated"),
+)
+_UNIVERSE_KEYS = tuple(key for key, _ in _UNIVERSE_FIELDS)
+_UNIVERSE_SELECT = f"""
+  SELECT {", ".join(column for _, column in _UNIVERSE_FIELDS)}
+  FROM stocks
+"""
+
+# Same for /api/market/top-movers
+_MOVER_FIELDS = (
+  ("ticker", "ticker"),
+  ("name", "name"),
+  ("price", "price"),
+  ("change1D", "change_1d"),
+  ("volume", "volume"),
+)
+_MOVER_KEYS = tuple(key for key, _ in _MOVER_FIELDS)
+_MOVER_SELECT = f"""
+  SELECT {", ".join(column for _, column in _MOVER_FIELDS)}
+  FROM stocks
+"""
+
+# Restricts a stocks query to rows whose ticker or name matches an FTS5 query
+_SEARCH_WHERE = "WHERE rowid IN (SELECT rowid FROM stocks_fts WHERE stocks_fts MATCH ?)"
+
+# Complete read statements, assembled once at import so every call passes the
+# same SQL text and hits sqlite3's per-connection statement cache
+_UNIVERSE_CORE_SQL = _UNIVERSE_SELECT + "ORDER BY market_cap DESC"
+_UNIVERSE_SEARCH_SQL = _UNIVERSE_SELECT + f"""
+  {_SEARCH_WHERE}
+  ORDER BY market_cap DESC
+  LIMIT 50
+"""
+_SEARCH_STOCKS_SQL = f"""
+  SELECT * FROM stocks
+  {_SEARCH_WHERE}
+  ORDER BY market_cap DESC
+  LIMIT 50
+"""
+_TOP_MOVERS_SQL = {
+  direction: _MOVER_SELECT + f"""
+  WHERE change_1d IS NOT NULL
+  ORDER BY change_1d {direction}
+  LIMIT ?
+"""
+  for direction in ("DESC", "ASC")
+}
+
+
+def _fts_prefix_query(query: str) -> str:
+  """Quote user input as a single FTS5 phrase and prefix-match its last token"""
+  return '"' + query.replace('"', '""') + '"*'
+
+
+# Responses built from the stocks table; cleared whenever stocks are re-imported
+universe_cache = TTLCache(DB_QUERY_TTL)
+stock_cache = TTLCache(DB_QUERY_TTL, max_entries=1024)
+
+# Cached in stock_cache for tickers that don't exist, so repeated misses skip the DB
+_NOT_FOUND = object()
+
+
+class _ConnectionPool:
+  """Bounded pool of SQLite connections, opened lazily with factory"""
+
+  def __init__(self, factory: Callable[[], sqlite3.Connection], size: int,
+               timeout: float = POOL_TIMEOUT):
+      self._factory = factory
+      self._size = size
+      self._timeout = timeout
+      self._idle: queue.Queue = queue.Queue(maxsize=size)
+      self._created = 0
+      self._lock = threading.Lock()
+
+  def acquire(self) -> sqlite3.Connection:
+      """Take an idle connection, opening a new one while the pool is below capacity"""
+      try:
+          return self._idle.get_nowait()
+      except queue.Empty:
+          pass
+
+      with self._lock:
+          if self._created < self._size:
+              conn = self._factory()
+              self._created += 1
+              return conn
+
+      # Pool exhausted: wait for another thread to release a connection
+      try:
+          return self._idle.get(timeout=self._timeout)
+      except queue.Empty:
+          raise sqlite3.OperationalError(
+              f"No database connection available after {self._timeout:g}s "
+              f"({self._size} in use)"
+          ) from None
+
+  def release(self, conn: sqlite3.Connection):
+      """Return a connection to the pool, discarding it if it cannot be reset"""
+      try:
+          if conn.in_transaction:
+              conn.rollback()
+      except sqlite3.Error:
+          logger.warning("Discarding pooled connection after failed rollback", exc_info=True)
+          try:
+              conn.close()
+          finally:
+              with self._lock:
+                  self._created -= 1
+          return
+      self._idle.put(conn)
+
+  def close(self):
+      """Close all idle connections"""
+      with self._lock:
+          while True:
+              try:
+                  conn = self._idle.get_nowait()
+              except queue.Empty:
+                  break
+              conn.close()
+              self._created -= 1
+
 
 class DatabaseManager:
   """Manages SQLite database for stock data caching"""
 
-  def __init__(self, db_path: str = "data/stocks.db"):
+  def __init__(self, db_path: str = "data/stocks.db", pool_size: int = POOL_SIZE):
       self.db_path = db_path
       Path(db_path).parent.mkdir(parents=True, exist_ok=True)
-      self._local = threading.local()  # ADD THIS LINE
-  
-  def connect(self):
-      """Get thread-local connection"""
-      # REPLACE OLD connect() METHOD WITH THIS:
-      if not hasattr(self._local, 'connection') or self._local.connection is None:
-          self._local.connection = sqlite3.connect(
-              self.db_path,
-              check_same_thread=False,
-              timeout=30.0
-          )
-          self._local.connection.row_factory = sqlite3.Row
-      return self._local.connection
-  
+      # SQLite allows one writer at a time, so writes queue on a single connection
+      # while reads spread over read-only connections that WAL never blocks
+      self._write_pool = _ConnectionPool(self.connect, 1)
+      self._read_pool = _ConnectionPool(self.ro_connect, pool_size)
+
+  def connect(self) -> sqlite3.Connection:
+      """Open a new read-write database connection"""
+      conn = sqlite3.connect(
+          self.db_path,
+          check_same_thread=False,
+          isolation_level=None  # autocommit; bulk writes issue explicit BEGIN
+      )
+      conn.executescript(_CONNECTION_PRAGMAS)
+      conn.row_factory = sqlite3.Row
+      return conn
+
+  def ro_connect(self) -> sqlite3.Connection:
+      """Open a new read-only database connection"""
+      conn = sqlite3.connect(
+          Path(self.db_path).resolve().as_uri() + "?mode=ro",
+          uri=True,
+          check_same_thread=False,
+          isolation_level=None
+      )
+      conn.executescript(_READONLY_PRAGMAS)
+      conn.row_factory = sqlite3.Row
+      return conn
+
+  @contextmanager
+  def get_conn(self, readonly: bool = False) -> Iterator[sqlite3.Connection]:
+      """Borrow a pooled connection for the duration of a with-block"""
+      pool = self._read_pool if readonly else self._write_pool
+      conn = pool.acquire()
+      try:
+          yield conn
+      finally:
+          pool.release(conn)
+
   def close(self):
-      """Close thread-local connection"""
-      # REPLACE OLD close() METHOD WITH THIS:
-      if hasattr(self._local, 'connection') and self._local.connection:
-          self._local.connection.close()
-          self._local.connection = None
+      """Close all idle pooled connections"""
+      self._write_pool.close()
+      self._read_pool.close()
 
   def init_database(self):
     """Initialize database with schema"""
@@ -39,104 +276,164 @@ class DatabaseManager:
     with open(schema_path, 'r', encoding='utf-8') as f:
       schema = f.read()
 
-    conn = self.connect()
-    conn.executescript(schema)
-    conn.commit()
-    print(f"Database initialized at {self.db_path}")
-    self.close()
+    with self.get_conn() as conn:
+      conn.executescript(schema)
+    self.migrate()
+    logger.info("Database initialized at %s", self.db_path)
+
+  def migrate(self):
+    """Apply idempotent schema upgrades without touching existing data.
+
+    Skipped with a warning when the stocks table doesn't exist yet; run
+    init_database() to create the full schema.
+    """
+    migrations_path = Path(__file__).parent / "migrations.sql"
+
+    with open(migrations_path, 'r', encoding='utf-8') as f:
+      migrations = f.read()
+
+    with self.get_conn() as conn:
+      has_stocks = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'stocks'"
+      ).fetchone()
+      if not has_stocks:
+        logger.warning("Skipping migrations: no stocks table in %s (run init_database)", self.db_path)
+        return
+      conn.executescript(migrations)
+    universe_cache.clear()
+    stock_cache.clear()
 
   def insert_stocks_bulk(self, stocks: List[dict]) -> int:
-    """Insert multiple stocks efficiently"""
-    conn = self.connect()
-    cursor = conn.cursor()
-    success_count = 0
+    """Insert multiple stocks in a single transaction, one savepoint per chunk"""
+    with self.get_conn() as conn:
+      cursor = conn.cursor()
+      success_count = 0
 
-    try:
-      for stock in stocks:
+      conn.execute("BEGIN")
+      for start in range(0, len(stocks), INSERT_CHUNK_SIZE):
+        chunk = stocks[start:start + INSERT_CHUNK_SIZE]
+        conn.execute("SAVEPOINT insert_chunk")
         try:
-          cursor.execute("""
-            INSERT OR REPLACE INTO stocks (
-              ticker, name, sector, industry,
-              price, change_1d, change_1w, change_1m, change_1y, change_5y, change_ytd,
-              volume,
-              high_1d, low_1d, high_1m, low_1m, high_1y, low_1y, high_5y, low_5y,
-              pe_ratio, eps, dividend_yield, market_cap, shares_outstanding,
-              net_profit_margin, gross_margin, roe, revenue_ttm,
-              beta, institutional_ownership, debt_to_equity,
-              year_founded, website, city, state, zip, weight,
-              last_updated, data_source, is_sp500
-            ) VALUES (
-              :ticker, :name, :sector, :industry,
-              :price, :change_1d, :change_1w, :change_1m, :change_1y, :change_5y, :change_ytd,
-              :volume,
-              :high_1d, :low_1d, :high_1m, :low_1m, :high_1y, :low_1y, :high_5y, :low_5y,
-              :pe_ratio, :eps, :dividend_yield, :market_cap, :shares_outstanding,
-              :net_profit_margin, :gross_margin, :roe, :revenue_ttm,
-              :beta, :institutional_ownership, :debt_to_equity,
-              :year_founded, :website, :city, :state, :zip, :weight,
-              :last_updated, :data_source, :is_sp500
-            )
-          """, stock)
-          success_count += 1
-        except Exception as e:
-          print(f"Error inserting {stock.get('ticker')}: {e}")
-
+          cursor.executemany(_INSERT_STOCK_SQL, chunk)
+          conn.execute("RELEASE insert_chunk")
+          success_count += len(chunk)
+        except sqlite3.Error as e:
+          # Undo just this chunk, then replay it row by row to isolate the bad record
+          conn.execute("ROLLBACK TO insert_chunk")
+          conn.execute("RELEASE insert_chunk")
+          logger.warning("Chunk insert failed (%s), retrying %d rows individually", e, len(chunk))
+          for stock in chunk:
+            try:
+              cursor.execute(_INSERT_STOCK_SQL, stock)
+              success_count += 1
+            except Exception as e:
+              logger.error("Error inserting %s: %s", stock.get('ticker'), e)
       conn.commit()
-      print(f"Inserted/updated {success_count}/{len(stocks)} stocks")
-      return success_count
 
-    finally:
-      self.close()
+      # Refresh planner statistics so index choices track the new data
+      conn.execute("ANALYZE stocks")
 
-  def get_stock(self, ticker: str) -> Optional[dict]:
-    """Get a single stock by ticker"""
-    conn = self.connect()
-    cursor = conn.cursor()
+      universe_cache.clear()
+      stock_cache.clear()
+      logger.info("Inserted/updated %d/%d stocks", success_count, len(stocks))
+      return success_count
 
-    try:
-      cursor.execute("SELECT * FROM stocks WHERE ticker = ?", (ticker,))
+  def get_stock(self, ticker: str) -> Optional[dict]:
+    """Get a single stock by ticker (case-insensitive)"""
+    cache_key = ticker.upper()
+    cached, stale = stock_cache.get(cache_key)
+    if cached is not None and not stale:
+      return None if cached is _NOT_FOUND else cached
+    generation = stock_cache.generation
+
+    with self.get_conn(readonly=True) as conn:
+      cursor = conn.cursor()
+      cursor.execute("SELECT * FROM stocks WHERE ticker = ? COLLATE NOCASE", (ticker,))
       row = cursor.fetchone()
-      return dict(row) if row else None
-    finally:
-      self.close()
+      stock = dict(row) if row else None
+
+    stock_cache.set(cache_key, stock if stock else _NOT_FOUND, generation)
+    return stock
 
   def get_all_stocks(self, order_by: str = "market_cap DESC") -> List[dict]:
-    """Get all stocks"""
-    conn = self.connect()
-    cursor = conn.cursor()
+    """Get all stocks, ordered by one of the _ALL_STOCKS_QUERIES keys"""
+    sql = _ALL_STOCKS_QUERIES.get(order_by)
+    if sql is None:
+      raise ValueError(f"Unsupported order_by: {order_by!r}")
 
-    try:
-      cursor.execute(f"SELECT * FROM stocks ORDER BY {order_by}")
+    with self.get_conn(readonly=True) as conn:
+      cursor = conn.cursor()
+      cursor.execute(sql)
       rows = cursor.fetchall()
       return [dict(row) for row in rows]
-    finally:
-      self.close()
 
-  def search_stocks(self, query: str) -> List[dict]:
-    """Search stocks by ticker or name"""
-    conn = self.connect()
-    cursor = conn.cursor()
+  def get_universe_rows(self) -> List[dict]:
+    """Get all stocks by market cap, shaped for /api/universe/core"""
+    with self.get_conn(readonly=True) as conn:
+      cursor = conn.cursor()
+      cursor.row_factory = None
+      cursor.execute(_UNIVERSE_CORE_SQL)
+      return [dict(zip(_UNIVERSE_KEYS, row)) for row in cursor]
 
-    try:
-      search_term = f"%{query.upper()}%"
+  def search_universe_rows(self, query: str) -> List[dict]:
+    """Search stocks by ticker or name prefix, shaped for /api/universe/search"""
+    with self.get_conn(readonly=True) as conn:
+      cursor = conn.cursor()
+      cursor.row_factory = None
+      cursor.execute(_UNIVERSE_SEARCH_SQL, (_fts_prefix_query(query),))
+      return [dict(zip(_UNIVERSE_KEYS, row)) for row in cursor]
+
+  def get_sector_aggregates(self) -> List[dict]:
+    """Get average 1D/1W/1M change and stock count per sector, best 1D first"""
+    with self.get_conn(readonly=True) as conn:
+      cursor = conn.cursor()
       cursor.execute("""
-        SELECT * FROM stocks 
-        WHERE ticker LIKE ? OR UPPER(name) LIKE ?
-        ORDER BY market_cap DESC
-        LIMIT 50
-      """, (search_term, search_term))
+        SELECT
+          sector,
+          COALESCE(ROUND(AVG(change_1d), 2), 0.0) AS change_1d,
+          COALESCE(ROUND(AVG(change_1w), 2), 0.0) AS change_1w,
+          COALESCE(ROUND(AVG(change_1m), 2), 0.0) AS change_1m,
+          COUNT(*) AS stock_count
+        FROM stocks
+        WHERE sector IS NOT NULL AND sector NOT IN ('', '--')
+        GROUP BY sector
+        ORDER BY change_1d DESC
+      """)
+      rows = cursor.fetchall()
+      return [dict(row) for row in rows]
+
+  def get_top_movers(self, limit: int = 10) -> Tuple[List[dict], List[dict]]:
+    """Get the biggest 1D gainers and losers, shaped for /api/market/top-movers"""
+    with self.get_conn(readonly=True) as conn:
+      cursor = conn.cursor()
+      cursor.row_factory = None
+      movers = []
+      for direction in ("DESC", "ASC"):
+        cursor.execute(_TOP_MOVERS_SQL[direction], (limit,))
+        movers.append([dict(zip(_MOVER_KEYS, row)) for row in cursor])
+      gainers, losers = movers
+      return gainers, losers
+
+  def get_stock_count(self) -> int:
+    """Get number of stocks in the database"""
+    with self.get_conn(readonly=True) as conn:
+      cursor = conn.cursor()
+      cursor.execute("SELECT COUNT(*) FROM stocks")
+      return cursor.fetchone()[0]
+
+  def search_stocks(self, query: str) -> List[dict]:
+    """Search stocks by ticker or name prefix"""
+    with self.get_conn(readonly=True) as conn:
+      cursor = conn.cursor()
+      cursor.execute(_SEARCH_STOCKS_SQL, (_fts_prefix_query(query),))
 
       rows = cursor.fetchall()
       return [dict(row) for row in rows]
-    finally:
-      self.close()
 
   def get_stocks_by_sector(self, sector: str) -> List[dict]:
     """Get all stocks in a sector"""
-    conn = self.connect()
-    cursor = conn.cursor()
-
-    try:
+    with self.get_conn(readonly=True) as conn:
+      cursor = conn.cursor()
       cursor.execute("""
         SELECT * FROM stocks 
         WHERE sector = ?
@@ -145,16 +442,12 @@ class DatabaseManager:
 
       rows = cursor.fetchall()
       return [dict(row) for row in rows]
-    finally:
-      self.close()
 
   def log_refresh(self, stocks_updated: int, data_source: str,
                   success: bool, duration: float, error_msg: Optional[str] = None):
     """Log a data refresh event"""
-    conn = self.connect()
-    cursor = conn.cursor()
-
-    try:
+    with self.get_conn() as conn:
+      cursor = conn.cursor()
       cursor.execute("""
         INSERT INTO refresh_log (
           stocks_updated, data_source, success, error_message, duration_seconds
@@ -162,15 +455,11 @@ class DatabaseManager:
       """, (stocks_updated, data_source, success, error_msg, duration))
 
       conn.commit()
-    finally:
-      self.close()
 
   def get_data_age(self) -> Optional[float]:
     """Get age of cached data in minutes"""
-    conn = self.connect()
-    cursor = conn.cursor()
-
-    try:
+    with self.get_conn(readonly=True) as conn:
+      cursor = conn.cursor()
       cursor.execute("""
         SELECT 
           (julianday('now') - julianday(MAX(last_updated))) * 24 * 60 as age_minutes
@@ -178,8 +467,6 @@ class DatabaseManager:
       """)
       result = cursor.fetchone()
       return result['age_minutes'] if result else None
-    finally:
-      self.close()
 
   def needs_refresh(self, max_age_minutes: int = 15) -> bool:
     """Check if data needs refresh"""
@@ -190,9 +477,8 @@ class DatabaseManager:
 
   def get_refresh_history(self, limit: int = 5):
     """Return recent refresh log entries"""
-    conn = self.connect()
-    cursor = conn.cursor()
-    try:
+    with self.get_conn(readonly=True) as conn:
+      cursor = conn.cursor()
       cursor.execute("""
         SELECT refresh_time, stocks_updated, data_source, success, error_message, duration_seconds
         FROM refresh_log
@@ -201,8 +487,6 @@ class DatabaseManager:
       """, (limit,))
       rows = cursor.fetchall()
       return [dict(row) for row in rows]
-    finally:
-      self.close()
 
   # ============================================================================
   # MARKET INDICES METHODS
@@ -210,28 +494,22 @@ class DatabaseManager:
   def insert_or_update_index(self, symbol: str, name: str, value: float,
                              change: float, change_pct: float):
     """Insert or update a market index"""
-    conn = self.connect()
-    cursor = conn.cursor()
-    try:
+    with self.get_conn() as conn:
+      cursor = conn.cursor()
       cursor.execute('''
         INSERT OR REPLACE INTO market_indices 
         (symbol, name, value, change, change_pct, last_updated)
         VALUES (?, ?, ?, ?, ?, ?)
       ''', (symbol, name, value, change, change_pct, datetime.now().isoformat()))
       conn.commit()
-    finally:
-      self.close()
 
   def get_all_indices(self) -> List[dict]:
     """Get all market indices"""
-    conn = self.connect()
-    cursor = conn.cursor()
-    try:
+    with self.get_conn(readonly=True) as conn:
+      cursor = conn.cursor()
       cursor.execute('SELECT * FROM market_indices')
       rows = cursor.fetchall()
       return [dict(row) for row in rows]
-    finally:
-      self.close()
 
   # ============================================================================
   # ALTERNATIVE ASSETS METHODS
@@ -247,9 +525,8 @@ class DatabaseManager:
       fetch_error: str = None,
   ):
       """Insert or update an alternative asset (crypto, commodity, currency)."""
-      conn = self.connect()
-      cursor = conn.cursor()
-      try:
+      with self.get_conn() as conn:
+          cursor = conn.cursor()
           cursor.execute(
               """
               INSERT OR REPLACE INTO alternative_assets
@@ -268,19 +545,14 @@ class DatabaseManager:
               ),
           )
           conn.commit()
-      finally:
-          self.close()
 
   def get_all_alternative_assets(self) -> List[dict]:
       """Return all alternative assets."""
-      conn = self.connect()
-      cursor = conn.cursor()
-      try:
+      with self.get_conn(readonly=True) as conn:
+          cursor = conn.cursor()
           cursor.execute("SELECT * FROM alternative_assets")
           rows = cursor.fetchall()
           return [dict(row) for row in rows]
-      finally:
-          self.close()
 
   # ============================================================================
   # MACRO INDICATORS METHODS
@@ -289,51 +561,41 @@ class DatabaseManager:
                                  value: float, change: float = None,
                                  unit: str = '%'):
     """Insert or update a macro indicator"""
-    conn = self.connect()
-    cursor = conn.cursor()
-    try:
+    with self.get_conn() as conn:
+      cursor = conn.cursor()
       cursor.execute('''
         INSERT OR REPLACE INTO macro_indicators 
         (indicator_id, name, value, change, unit, last_updated)
         VALUES (?, ?, ?, ?, ?, ?)
       ''', (indicator_id, name, value, change, unit, datetime.now().isoformat()))
       conn.commit()
-    finally:
-      self.close()
 
   def get_all_indicators(self) -> List[dict]:
     """Get all macro indicators"""
-    conn = self.connect()
-    cursor = conn.cursor()
-    try:
+    with self.get_conn(readonly=True) as conn:
+      cursor = conn.cursor()
       cursor.execute('SELECT * FROM macro_indicators')
       rows = cursor.fetchall()
       return [dict(row) for row in rows]
-    finally:
-      self.close()
 
   # ============================================================================
   # HISTORICAL DATA METHODS
   # ============================================================================
   def insert_treasury_history(self, date: str, yield_10y: float, yield_2y: float = None):
     """Insert treasury yield data"""
-    conn = self.connect()
-    cursor = conn.cursor()
-    try:
+    with self.get_conn() as conn:
+      cursor = conn.cursor()
       cursor.execute('''
         INSERT OR REPLACE INTO treasury_history 
         (date, yield_10y, yield_2y, last_updated)
         VALUES (?, ?, ?, ?)
       ''', (date, yield_10y, yield_2y, datetime.now().isoformat()))
       conn.commit()
-    finally:
-      self.close()
 
   def get_treasury_history(self, days: int = 365) -> List[dict]:
     """Get treasury yield history"""
-    conn = self.connect()
-    cursor = conn.cursor()
-    try:
+    with self.get_conn(readonly=True) as conn:
+      cursor = conn.cursor()
       cutoff_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
       cursor.execute('''
         SELECT date, yield_10y, yield_2y FROM treasury_history 
@@ -342,29 +604,23 @@ class DatabaseManager:
       ''', (cutoff_date,))
       rows = cursor.fetchall()
       return [dict(row) for row in rows]
-    finally:
-      self.close()
 
   def insert_cpi_history(self, date: str, cpi_value: float,
                          mom_change: float = None, yoy_change: float = None):
     """Insert CPI historical data"""
-    conn = self.connect()
-    cursor = conn.cursor()
-    try:
+    with self.get_conn() as conn:
+      cursor = conn.cursor()
       cursor.execute('''
         INSERT OR REPLACE INTO cpi_history 
         (date, cpi_value, mom_change, yoy_change, last_updated)
         VALUES (?, ?, ?, ?, ?)
       ''', (date, cpi_value, mom_change, yoy_change, datetime.now().isoformat()))
       conn.commit()
-    finally:
-      self.close()
 
   def get_cpi_history(self, months: int = 12) -> List[dict]:
     """Get CPI history"""
-    conn = self.connect()
-    cursor = conn.cursor()
-    try:
+    with self.get_conn(readonly=True) as conn:
+      cursor = conn.cursor()
       cursor.execute('''
         SELECT date, cpi_value, mom_change, yoy_change FROM cpi_history 
         ORDER BY date DESC 
@@ -374,29 +630,23 @@ class DatabaseManager:
       # reverse to oldest -> newest
       result = [dict(row) for row in rows]
       return list(reversed(result))
-    finally:
-      self.close()
 
   def insert_vix_history(self, date: str, vix_close: float,
                          vix_high: float = None, vix_low: float = None):
     """Insert VIX historical data"""
-    conn = self.connect()
-    cursor = conn.cursor()
-    try:
+    with self.get_conn() as conn:
+      cursor = conn.cursor()
       cursor.execute('''
         INSERT OR REPLACE INTO vix_history 
         (date, vix_close, vix_high, vix_low, last_updated)
         VALUES (?, ?, ?, ?, ?)
       ''', (date, vix_close, vix_high, vix_low, datetime.now().isoformat()))
       conn.commit()
-    finally:
-      self.close()
 
   def get_vix_history(self, days: int = 365) -> List[dict]:
     """Get VIX history"""
-    conn = self.connect()
-    cursor = conn.cursor()
-    try:
+    with self.get_conn(readonly=True) as conn:
+      cursor = conn.cursor()
       cutoff_date = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
       cursor.execute('''
         SELECT date, vix_close, vix_high, vix_low FROM vix_history 
@@ -405,8 +655,6 @@ class DatabaseManager:
       ''', (cutoff_date,))
       rows = cursor.fetchall()
       return [dict(row) for row in rows]
-    finally:
-      self.close()
 
 
 # Global database instance
@@ -0,0 +1,37 @@
+-- AlphaStream Intelligence Terminal - Schema migrations
+-- Idempotent upgrades for databases created by an older schema.sql.
+-- Applied by DatabaseManager.migrate() on app startup and after init_database().
+
+BEGIN;
+
+-- Sector filter + market cap sort served by one index
+DROP INDEX IF EXISTS idx_sector;
+CREATE INDEX IF NOT EXISTS idx_sector_market_cap ON stocks(sector, market_cap DESC);
+
+-- Case-insensitive ticker lookups
+CREATE INDEX IF NOT EXISTS idx_ticker_nocase ON stocks(ticker COLLATE NOCASE);
+
+-- Full-text index over ticker/name for search, kept in sync with stocks by triggers.
+-- INSERT OR REPLACE only fires the delete trigger with PRAGMA recursive_triggers=ON.
+CREATE VIRTUAL TABLE IF NOT EXISTS stocks_fts USING fts5(
+    ticker, name,
+    content='stocks', content_rowid='rowid'
+);
+
+CREATE TRIGGER IF NOT EXISTS stocks_fts_ai AFTER INSERT ON stocks BEGIN
+    INSERT INTO stocks_fts(rowid, ticker, name) VALUES (new.rowid, new.ticker, new.name);
+END;
+
+CREATE TRIGGER IF NOT EXISTS stocks_fts_ad AFTER DELETE ON stocks BEGIN
+    INSERT INTO stocks_fts(stocks_fts, rowid, ticker, name) VALUES ('delete', old.rowid, old.ticker, old.name);
+END;
+
+CREATE TRIGGER IF NOT EXISTS stocks_fts_au AFTER UPDATE ON stocks BEGIN
+    INSERT INTO stocks_fts(stocks_fts, rowid, ticker, name) VALUES ('delete', old.rowid, old.ticker, old.name);
+    INSERT INTO stocks_fts(rowid, ticker, name) VALUES (new.rowid, new.ticker, new.name);
+END;
+
+-- Re-index from stocks so rows written before the triggers existed are searchable
+INSERT INTO stocks_fts(stocks_fts) VALUES('rebuild');
+
+COMMIT;
@@ -1,6 +1,7 @@
 -- AlphaStream Intelligence Terminal - Database Schema
 -- SQLite database for caching S&P 500 stock data
 
+DROP TABLE IF EXISTS stocks_fts;
 DROP TABLE IF EXISTS stocks;
 DROP TABLE IF EXISTS market_indices;
 DROP TABLE IF EXISTS macro_indicators;
@@ -73,7 +74,8 @@ CREATE TABLE stocks (
 );
 
 -- Indexes for performance
-CREATE INDEX idx_sector ON stocks(sector);
+-- The sector/ticker indexes and the stocks_fts search index live in migrations.sql;
+-- init_database() applies it right after this file, so the schema is incomplete without migrate()
 CREATE INDEX idx_last_updated ON stocks(last_updated);
 CREATE INDEX idx_market_cap ON stocks(market_cap DESC);
 CREATE INDEX idx_change_1d ON stocks(change_1d DESC);
@@ -1,22 +1,32 @@
+import asyncio
+import logging
 from datetime import datetime, timedelta
-from typing import List
+from typing import List, Optional
+
+import orjson
 
 from fastapi import FastAPI, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response
 
 from clients.finnhub_client import FinnhubRateLimitError, finnhub
 from config import NEWS_TTL
-from database.db_manager import db
+from database.db_manager import db, universe_cache
 from models import MarketNewsItem, MarketState, Portfolio, Stock
 from services.market import get_market_state
 from services.portfolio import get_mock_portfolio
 from utils.cache import TTLCache
+from utils.logging_config import configure_logging, stop_logging
 from services.refresh_scheduler import start_scheduler_background
 
+logger = logging.getLogger(__name__)
+
 app = FastAPI(
     title="AlphaStream API",
     description="Backend for AlphaStream Intelligence Terminal",
     version="0.1.0",
+    default_response_class=ORJSONResponse,
 )
 
 app.add_middleware(
@@ -39,12 +49,12 @@ async def get_latest_macro_snapshot():
     Returns: SPX, NDX, DJI, RUT, US10Y, VIX with current values and changes
     """
     try:
-        indices = db.get_all_indices()
+        indices = await run_in_threadpool(db.get_all_indices)
         if not indices:
             raise HTTPException(status_code=503, detail="Data not available")
         indices_dict = {idx["symbol"]: idx for idx in indices}
 
-        treasury = db.get_treasury_history(days=2)
+        treasury = await run_in_threadpool(db.get_treasury_history, days=2)
         if not treasury:
             raise HTTPException(status_code=503, detail="Data not available")
         us10y = treasury[-1]["yield_10y"] if treasury else None
@@ -52,7 +62,7 @@ async def get_latest_macro_snapshot():
         if len(treasury) >= 2:
             us10y_change = treasury[-1]["yield_10y"] - treasury[-2]["yield_10y"]
 
-        vix_history = db.get_vix_history(days=2)
+        vix_history = await run_in_threadpool(db.get_vix_history, days=2)
         if not vix_history:
             raise HTTPException(status_code=503, detail="Data not available")
         vix_value = vix_history[-1]["vix_close"] if vix_history else None
@@ -92,13 +102,24 @@ async def get_latest_macro_snapshot():
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error in get_latest_macro_snapshot: {e}")
+        logger.exception("Error in get_latest_macro_snapshot")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.on_event("startup")
 async def startup_event():
-    """Start background tasks on app startup"""
-    start_scheduler_background()
+    """Start logging and background tasks on app startup"""
+    app.state.log_listener = configure_logging()
+    # Schema DDL and the stocks_fts rebuild are blocking SQLite work; keep them off the event loop
+    await asyncio.to_thread(db.migrate)
+    # The initial refresh takes a while; run it in a worker thread so startup doesn't block
+    app.state.scheduler_task = asyncio.create_task(asyncio.to_thread(start_scheduler_background))
+
+
+@app.on_event("shutdown")
+def shutdown_event():
+    """Close pooled database connections and flush pending log records"""
+    db.close()
+    stop_logging(app.state.log_listener)
 
 
 # ============================================================================
@@ -112,7 +133,7 @@ def root():
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error in root: {e}")
+        logger.exception("Error in root")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -128,7 +149,7 @@ def health_check():
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error in health_check: {e}")
+        logger.exception("Error in health_check")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -143,43 +164,24 @@ def get_universe_core():
     Returns: List of all stocks with full data
     """
     try:
-        stocks = db.get_all_stocks(order_by="market_cap DESC")
-        if not stocks:
+        cache_key = "core:market_cap"
+        cached, stale = universe_cache.get(cache_key)
+        if cached and not stale:
+            return Response(content=cached, media_type="application/json")
+
+        generation = universe_cache.generation
+        rows = db.get_universe_rows()
+        if not rows:
             raise HTTPException(status_code=503, detail="Data not available")
-        result = []
-        for stock in stocks:
-            result.append(
-                {
-                    "ticker": stock["ticker"],
-                    "name": stock["name"],
-                    "sector": stock["sector"],
-                    "industry": stock["industry"],
-                    "price": stock["price"],
-                    "change1D": stock["change_1d"],
-                    "change1W": stock["change_1w"],
-                    "change1M": stock["change_1m"],
-                    "change1Y": stock["change_1y"],
-                    "volume": stock["volume"],
-                    "peRatio": stock["pe_ratio"],
-                    "eps": stock["eps"],
-                    "dividendYield": stock["dividend_yield"],
-                    "marketCap": stock["market_cap"],
-                    "netProfitMargin": stock["net_profit_margin"],
-                    "grossMargin": stock["gross_margin"],
-                    "roe": stock["roe"],
-                    "revenue": stock["revenue_ttm"],
-                    "beta": stock["beta"],
-                    "institutionalOwnership": stock["institutional_ownership"],
-                    "yearFounded": stock["year_founded"],
-                    "website": stock["website"],
-                    "updatedAt": stock["last_updated"],
-                }
-            )
-        return result
+
+        # Cache the encoded body so hits skip serialization entirely
+        body = orjson.dumps(rows)
+        universe_cache.set(cache_key, body, generation)
+        return Response(content=body, media_type="application/json")
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error in get_universe_core: {e}")
+        logger.exception("Error in get_universe_core")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -189,43 +191,14 @@ def search_universe(q: str = Query(..., min_length=1)):
     Search stocks by ticker or name
     """
     try:
-        stocks = db.search_stocks(q)
-        if not stocks:
+        result = db.search_universe_rows(q)
+        if not result:
             raise HTTPException(status_code=503, detail="Data not available")
-        result = []
-        for stock in stocks:
-            result.append(
-                {
-                    "ticker": stock["ticker"],
-                    "name": stock["name"],
-                    "sector": stock["sector"],
-                    "industry": stock["industry"],
-                    "price": stock["price"],
-                    "change1D": stock["change_1d"],
-                    "change1W": stock["change_1w"],
-                    "change1M": stock["change_1m"],
-                    "change1Y": stock["change_1y"],
-                    "volume": stock["volume"],
-                    "peRatio": stock["pe_ratio"],
-                    "eps": stock["eps"],
-                    "dividendYield": stock["dividend_yield"],
-                    "marketCap": stock["market_cap"],
-                    "netProfitMargin": stock["net_profit_margin"],
-                    "grossMargin": stock["gross_margin"],
-                    "roe": stock["roe"],
-                    "revenue": stock["revenue_ttm"],
-                    "beta": stock["beta"],
-                    "institutionalOwnership": stock["institutional_ownership"],
-                    "yearFounded": stock["year_founded"],
-                    "website": stock["website"],
-                    "updatedAt": stock["last_updated"],
-                }
-            )
         return result
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error in search_universe: {e}")
+        logger.exception("Error in search_universe")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -235,7 +208,7 @@ def get_stock(ticker: str):
     Get detailed information for a specific stock
     """
     try:
-        stock = db.get_stock(ticker.upper())
+        stock = db.get_stock(ticker)
         if not stock:
             raise HTTPException(status_code=404, detail=f"Stock {ticker} not found")
 
@@ -283,7 +256,7 @@ def get_stock(ticker: str):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error in get_stock: {e}")
+        logger.exception("Error in get_stock")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -295,88 +268,56 @@ def get_stock(ticker: str):
 def get_sector_performance():
     """Calculate sector performance by aggregating stocks in database"""
     try:
-        all_stocks = db.get_all_stocks()
-        if not all_stocks:
+        cache_key = "sectors"
+        cached, stale = universe_cache.get(cache_key)
+        if cached and not stale:
+            return cached
+
+        generation = universe_cache.generation
+        sectors = db.get_sector_aggregates()
+        if not sectors:
             raise HTTPException(status_code=503, detail="Data not available")
-        sectors = {}
-        for stock in all_stocks:
-            sector = stock["sector"]
-            if sector and sector not in ["", "--"]:
-                if sector not in sectors:
-                    sectors[sector] = {
-                        "sector": sector,
-                        "change1D": [],
-                        "change1W": [],
-                        "change1M": [],
-                        "count": 0,
-                    }
-                sectors[sector]["change1D"].append(stock["change_1d"])
-                sectors[sector]["change1W"].append(stock["change_1w"])
-                sectors[sector]["change1M"].append(stock["change_1m"])
-                sectors[sector]["count"] += 1
-
-        result = []
-        for sector, data in sectors.items():
-            result.append(
-                {
-                    "sector": sector,
-                    "change1D": round(sum(data["change1D"]) / len(data["change1D"]), 2)
-                    if data["change1D"]
-                    else 0.0,
-                    "change1W": round(sum(data["change1W"]) / len(data["change1W"]), 2)
-                    if data["change1W"]
-                    else 0.0,
-                    "change1M": round(sum(data["change1M"]) / len(data["change1M"]), 2)
-                    if data["change1M"]
-                    else 0.0,
-                    "stockCount": data["count"],
-                }
-            )
 
-        result.sort(key=lambda x: x["change1D"], reverse=True)
+        result = [
+            {
+                "sector": row["sector"],
+                "change1D": row["change_1d"],
+                "change1W": row["change_1w"],
+                "change1M": row["change_1m"],
+                "stockCount": row["stock_count"],
+            }
+            for row in sectors
+        ]
+        universe_cache.set(cache_key, result, generation)
         return result
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error in get_sector_performance: {e}")
+        logger.exception("Error in get_sector_performance")
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @app.get("/api/market/top-movers")
-def get_top_movers(limit: int = 10):
+def get_top_movers(limit: int = Query(10, ge=1, le=100)):
     """Get top gaining and losing stocks today"""
     try:
-        gainers = db.get_all_stocks(order_by="change_1d DESC")[:limit]
-        losers = db.get_all_stocks(order_by="change_1d ASC")[:limit]
+        cache_key = f"movers:{limit}"
+        cached, stale = universe_cache.get(cache_key)
+        if cached and not stale:
+            return cached
+
+        generation = universe_cache.generation
+        gainers, losers = db.get_top_movers(limit)
         if not gainers or not losers:
             raise HTTPException(status_code=503, detail="Data not available")
 
-        return {
-            "gainers": [
-                {
-                    "ticker": s["ticker"],
-                    "name": s["name"],
-                    "price": s["price"],
-                    "change1D": s["change_1d"],
-                    "volume": s["volume"],
-                }
-                for s in gainers
-            ],
-            "losers": [
-                {
-                    "ticker": s["ticker"],
-                    "name": s["name"],
-                    "price": s["price"],
-                    "change1D": s["change_1d"],
-                    "volume": s["volume"],
-                }
-                for s in losers
-            ],
-        }
+        result = {"gainers": gainers, "losers": losers}
+        universe_cache.set(cache_key, result, generation)
+        return result
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error in get_top_movers: {e}")
+        logger.exception("Error in get_top_movers")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -394,7 +335,7 @@ def market_state():
     except FinnhubRateLimitError as exc:
         raise HTTPException(status_code=503, detail=str(exc))
     except Exception as exc:
-        print(f"Error in market_state: {exc}")
+        logger.exception("Error in market_state")
         raise HTTPException(status_code=500, detail=str(exc))
 
 
@@ -406,14 +347,36 @@ def portfolio():
             raise HTTPException(status_code=503, detail="Data not available")
         return result
     except Exception as exc:
-        print(f"Error in portfolio: {exc}")
+        logger.exception("Error in portfolio")
         raise HTTPException(status_code=500, detail=str(exc))
 
 
 news_cache = TTLCache(NEWS_TTL)
 
 
-@app.get("/api/news", response_model=List[MarketNewsItem])
+def _news_item(item: dict, category: str, tickers: Optional[List[str]] = None) -> MarketNewsItem:
+    """Build a MarketNewsItem from a Finnhub news record, skipping Pydantic validation.
+
+    Null text fields become empty strings so the result still matches the declared schema.
+    """
+    return MarketNewsItem.model_construct(
+        id=str(item.get("id", item.get("datetime", ""))),
+        headline=item.get("headline") or "",
+        summary=item.get("summary") or "",
+        source=item.get("source") or "",
+        publishedAt=datetime.fromtimestamp(item.get("datetime", 0)).isoformat(),
+        category=category,
+        sentiment="neutral",
+        tickers=tickers or [],
+        url=item.get("url"),
+    )
+
+
+@app.get(
+    "/api/news",
+    response_model=None,
+    responses={200: {"model": List[MarketNewsItem]}},
+)
 def news(category: str = "general"):
     try:
         cache_key = f"news:{category}"
@@ -422,20 +385,7 @@ def news(category: str = "general"):
             return cached
 
         news_data = finnhub.get_market_news(category)
-        items = []
-        for item in news_data[:20]:
-            items.append(
-                MarketNewsItem(
-                    id=str(item.get("id", item.get("datetime", ""))),
-                    headline=item.get("headline", ""),
-                    summary=item.get("summary", ""),
-                    source=item.get("source", ""),
-                    publishedAt=datetime.fromtimestamp(item.get("datetime", 0)).isoformat(),
-                    category=category,
-                    sentiment="neutral",
-                    url=item.get("url"),
-                )
-            )
+        items = [_news_item(item, category) for item in news_data[:20]]
         news_cache.set(cache_key, items)
         return items
     except FinnhubRateLimitError as exc:
@@ -444,11 +394,15 @@ def news(category: str = "general"):
             return cached
         raise HTTPException(status_code=503, detail=str(exc))
     except Exception as exc:
-        print(f"Error in news: {exc}")
+        logger.exception("Error in news")
         raise HTTPException(status_code=500, detail=str(exc))
 
 
-@app.get("/api/news/{ticker}", response_model=List[MarketNewsItem])
+@app.get(
+    "/api/news/{ticker}",
+    response_model=None,
+    responses={200: {"model": List[MarketNewsItem]}},
+)
 def company_news(ticker: str):
     try:
         cache_key = f"news:{ticker.upper()}"
@@ -459,21 +413,10 @@ def company_news(ticker: str):
         to_date = datetime.now().strftime("%Y-%m-%d")
         from_date = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
         news_data = finnhub.get_company_news(ticker.upper(), from_date, to_date)
-        items = []
-        for item in news_data[:20]:
-            items.append(
-                MarketNewsItem(
-                    id=str(item.get("id", item.get("datetime", ""))),
-                    headline=item.get("headline", ""),
-                    summary=item.get("summary", ""),
-                    source=item.get("source", ""),
-                    publishedAt=datetime.fromtimestamp(item.get("datetime", 0)).isoformat(),
-                    category="company",
-                    sentiment="neutral",
-                    tickers=[ticker.upper()],
-                    url=item.get("url"),
-                )
-            )
+        items = [
+            _news_item(item, "company", tickers=[ticker.upper()])
+            for item in news_data[:20]
+        ]
         news_cache.set(cache_key, items)
         return items
     except FinnhubRateLimitError as exc:
@@ -482,7 +425,7 @@ def company_news(ticker: str):
             return cached
         raise HTTPException(status_code=503, detail=str(exc))
     except Exception as exc:
-        print(f"Error in company_news: {exc}")
+        logger.exception("Error in company_news")
         raise HTTPException(status_code=500, detail=str(exc))
 
 
@@ -502,12 +445,12 @@ def get_data_status():
             "data_age_minutes": round(age_minutes, 2) if age_minutes else None,
             "last_refresh": refresh_history if refresh_history else None,
             "recent_refreshes": refresh_history,
-            "total_stocks": len(db.get_all_stocks()),
+            "total_stocks": db.get_stock_count(),
         }
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error in get_data_status: {e}")
+        logger.exception("Error in get_data_status")
         raise HTTPException(status_code=500, detail=str(e))
 
 # ============================================================================
@@ -525,7 +468,7 @@ def get_market_indices():
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error in get_market_indices: {e}")
+        logger.exception("Error in get_market_indices")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -540,7 +483,7 @@ def get_macro_indicators():
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error in get_macro_indicators: {e}")
+        logger.exception("Error in get_macro_indicators")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -555,7 +498,7 @@ def get_treasury_history(days: int = 365):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error in get_treasury_history: {e}")
+        logger.exception("Error in get_treasury_history")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -578,7 +521,7 @@ def get_cpi_history(months: int = 12):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error in get_cpi_history: {e}")
+        logger.exception("Error in get_cpi_history")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -601,7 +544,7 @@ def get_vix_history(days: int = 365):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error in get_vix_history: {e}")
+        logger.exception("Error in get_vix_history")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -620,7 +563,7 @@ def get_data_status_summary():
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error in get_data_status_summary: {e}")
+        logger.exception("Error in get_data_status_summary")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -631,7 +574,7 @@ async def get_alternative_assets():
     Returns NULL values when fetch failed; no synthetic data.
     """
     try:
-        assets = db.get_all_alternative_assets()
+        assets = await run_in_threadpool(db.get_all_alternative_assets)
         if not assets:
             raise HTTPException(
                 status_code=503,
@@ -640,15 +583,15 @@ async def get_alternative_assets():
 
         failed = [a for a in assets if a.get("fetch_error") is not None]
         if failed:
-            print(f"⚠ Warning: {len(failed)} alternative assets have fetch errors")
+            logger.warning("%d alternative assets have fetch errors", len(failed))
             for asset in failed:
-                print(f"  - {asset['symbol']}: {asset.get('fetch_error')}")
+                logger.warning("  - %s: %s", asset["symbol"], asset.get("fetch_error"))
 
         return assets
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error in get_alternative_assets: {e}")
+        logger.exception("Error in get_alternative_assets")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -663,7 +606,7 @@ async def get_ticker_all():
 
         # Market indices
         try:
-            indices = db.get_all_indices()
+            indices = await run_in_threadpool(db.get_all_indices)
             for idx in indices:
                 ticker_items.append(
                     {
@@ -677,12 +620,12 @@ async def get_ticker_all():
                         "error": None,
                     }
                 )
-        except Exception as e:
-            print(f"❌ Failed to fetch indices for ticker: {e}")
+        except Exception:
+            logger.exception("Failed to fetch indices for ticker")
 
         # Treasury yields (US10Y, US2Y)
         try:
-            treasury = db.get_treasury_history(days=2)
+            treasury = await run_in_threadpool(db.get_treasury_history, days=2)
             if treasury and len(treasury) >= 2:
                 latest = treasury[-1]
                 prev = treasury[-2]
@@ -718,12 +661,12 @@ async def get_ticker_all():
                             "error": None,
                         }
                     )
-        except Exception as e:
-            print(f"❌ Failed to fetch treasury data for ticker: {e}")
+        except Exception:
+            logger.exception("Failed to fetch treasury data for ticker")
 
         # Alternative assets (crypto, commodities, currencies)
         try:
-            alt_assets = db.get_all_alternative_assets()
+            alt_assets = await run_in_threadpool(db.get_all_alternative_assets)
             for asset in alt_assets:
                 ticker_items.append(
                     {
@@ -737,8 +680,8 @@ async def get_ticker_all():
                         "error": asset.get("fetch_error"),
                     }
                 )
-        except Exception as e:
-            print(f"❌ Failed to fetch alternative assets for ticker: {e}")
+        except Exception:
+            logger.exception("Failed to fetch alternative assets for ticker")
 
         if not ticker_items:
             raise HTTPException(
@@ -751,13 +694,13 @@ async def get_ticker_all():
             for item in ticker_items
             if item.get("error") is not None or item.get("value") is None
         )
-        print(f"📊 Ticker endpoint: {total} items ({failed} with errors or nulls)")
+        logger.info("Ticker endpoint: %d items (%d with errors or nulls)", total, failed)
 
         return ticker_items
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Error in get_ticker_all: {e}")
+        logger.exception("Error in get_ticker_all")
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -1,4 +1,5 @@
 """Initialize database with S&P 500 data and macro data"""
+import atexit
 import sys
 from pathlib import Path
 
@@ -8,6 +9,9 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from database.db_manager import db
 from services.sp500_importer import fetch_and_import_sp500
 from services.macro_importer import initialize_all_macro_data, initialize_alternative_assets
+from utils.logging_config import configure_logging, stop_logging
+
+atexit.register(stop_logging, configure_logging())
 
 print("=" * 60)
 print("AlphaStream Intelligence Terminal - Database Setup")
@@ -1,14 +1,19 @@
 """Test database queries"""
+import atexit
 import sys
 from pathlib import Path
 
 sys.path.append(str(Path(__file__).parent.parent))
 
 from database.db_manager import db
+from utils.logging_config import configure_logging, stop_logging
+
+atexit.register(stop_logging, configure_logging())
 
 
 def main():
     print("Testing database queries...\n")
+    db.migrate()
 
     print("1️⃣ Get AAPL:")
     aapl = db.get_stock('AAPL')
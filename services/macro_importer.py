@@ -1,4 +1,5 @@
 """Fetch and import macro economic data into database"""
+import traceback
 import yfinance as yf
 from fredapi import Fred
 import pandas as pd
@@ -262,7 +263,6 @@ def fetch_and_import_cpi_history():
         
     except Exception as e:
         print(f"Error fetching CPI history: {e}")
-        import traceback
         traceback.print_exc()
         return 0
 
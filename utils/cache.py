@@ -1,18 +1,32 @@
 from __future__ import annotations
 
+import threading
 import time
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Optional, Tuple
 
 
 class TTLCache:
-    """Simple in-memory TTL cache with stale indication."""
+    """Simple in-memory TTL cache with stale indication.
 
-    def __init__(self, ttl_seconds: int):
+    When max_entries is set, the oldest entry is evicted once the cache is full.
+    Safe to share between request threads; pass the generation read before
+    computing a value to set() so a clear() in between discards it.
+    """
+
+    def __init__(self, ttl_seconds: int, max_entries: Optional[int] = None):
         self.ttl = ttl_seconds
+        self.max_entries = max_entries
         self._store: Dict[str, Tuple[Any, float]] = {}
+        self._lock = threading.Lock()
+        self.generation = 0
 
-    def set(self, key: str, value: Any) -> None:
-        self._store[key] = (value, time.time() + self.ttl)
+    def set(self, key: str, value: Any, generation: Optional[int] = None) -> None:
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            if self.max_entries and key not in self._store and len(self._store) >= self.max_entries:
+                self._store.pop(next(iter(self._store)), None)
+            self._store[key] = (value, time.time() + self.ttl)
 
     def get(self, key: str) -> Tuple[Any, bool]:
         """
@@ -30,5 +44,6 @@ class TTLCache:
         return value, False
 
     def clear(self) -> None:
-        self._store.clear()
-
+        with self._lock:
+            self._store.clear()
+            self.generation += 1
@@ -0,0 +1,30 @@
+import logging
+import logging.handlers
+import queue
+
+
+def configure_logging() -> logging.handlers.QueueListener:
+    """Send log records through a queue so request threads never block on stream writes.
+
+    Returns the started listener; pass it to stop_logging() to flush pending records.
+    """
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(
+        logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+    )
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    listener.start()
+    return listener
+
+
+def stop_logging(listener: logging.handlers.QueueListener) -> None:
+    """Flush and stop a listener from configure_logging(), detaching its queue from the root logger"""
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        if isinstance(handler, logging.handlers.QueueHandler) and handler.queue is listener.queue:
+            root.removeHandler(handler)
+    listener.stop()